@@ -1,15 +1,15 @@
 """Streamlit dashboard for shipping rate monitoring."""
 import os
 import streamlit as st
+import numpy as np
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
-from streamlit_autorefresh import st_autorefresh
 
 from storage import StorageManager
 from scheduler import init_scheduler, get_scheduler
-from config import PACKAGES, ROUTES, SCRAPE_INTERVAL_SECONDS
+from config import PACKAGES, ROUTES, SCRAPE_INTERVAL_SECONDS, HISTORY_MAX_POINTS
 from scrapers import use_live_rates, get_live_rate_provider
 
 # Page configuration
@@ -20,11 +20,15 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Auto-refresh every 5 minutes (300000 ms)
-st_autorefresh(interval=300000, key="data_refresh")
+
+@st.cache_resource
+def get_storage() -> StorageManager:
+    """One storage manager per server process, shared with the scheduler."""
+    return StorageManager()
+
 
 # Initialize storage
-storage = StorageManager()
+storage = get_storage()
 
 # Initialize scheduler (runs in background)
 if "scheduler_initialized" not in st.session_state:
@@ -39,6 +43,21 @@ else:
     scheduler = get_scheduler()
 
 
+TAB_CURRENT = "📊 Current Rates"
+TAB_HISTORY = "📈 Rate History"
+TAB_CHANGES = "🔔 Rate Changes"
+TAB_STATUS = "ℹ️ Status"
+VIEWS = [TAB_CURRENT, TAB_HISTORY, TAB_CHANGES, TAB_STATUS]
+
+# Low-cardinality text columns, stored as categoricals in every DataFrame
+CATEGORY_COLUMNS = {
+    "Carrier": "category",
+    "Service": "category",
+    "Package": "category",
+    "Route": "category",
+}
+
+
 def format_price(price: float, currency: str = "USD") -> str:
     """Format price for display."""
     if currency == "USD":
@@ -46,52 +65,269 @@ def format_price(price: float, currency: str = "USD") -> str:
     return f"{price:.2f} {currency}"
 
 
-def get_current_rates_df() -> pd.DataFrame:
-    """Get current rates as a DataFrame."""
-    latest_rates = storage.get_latest_rates()
+def _data_version() -> str:
+    """Token that changes whenever a scrape stores new rates."""
+    return storage.get_scrape_status()["last_scrape"] or ""
 
-    if not latest_rates:
-        return pd.DataFrame()
 
-    data = []
-    for rate in latest_rates.values():
-        data.append({
-            "Carrier": rate.carrier,
-            "Service": rate.service,
-            "Package": rate.package_name,
-            "Route": f"{rate.origin} → {rate.destination}",
-            "Price": rate.price,
-            "Currency": rate.currency,
-            "Delivery Days": rate.delivery_days or "N/A",
-            "Last Updated": rate.timestamp,
-        })
+@st.cache_data(ttl=SCRAPE_INTERVAL_SECONDS)
+def _rates_df(version: str) -> pd.DataFrame:
+    """Build the current rates DataFrame (cached per data version)."""
+    cols = storage.latest_rates_columns()
+
+    if not cols["carrier"]:
+        return pd.DataFrame()
 
-    return pd.DataFrame(data)
+    return pd.DataFrame({
+        "Carrier": cols["carrier"],
+        "Service": cols["service"],
+        "Package": cols["package_name"],
+        "Route": cols["route"],
+        "Price": cols["price"],
+        "Currency": cols["currency"],
+        "Delivery Days": [days or "N/A" for days in cols["delivery_days"]],
+        "Last Updated": cols["timestamp"],
+    }, copy=False).astype(CATEGORY_COLUMNS)
 
 
-def get_changes_df() -> pd.DataFrame:
-    """Get recent rate changes as a DataFrame."""
-    changes = storage.get_all_changes(limit=50)
+@st.cache_data(ttl=SCRAPE_INTERVAL_SECONDS)
+def _changes_df(version: str, limit: int) -> pd.DataFrame:
+    """Build the recent changes DataFrame (cached per data version)."""
+    changes = storage.get_all_changes(limit=limit)
 
     if not changes:
         return pd.DataFrame()
 
-    data = []
+    carriers, services, packages, routes = [], [], [], []
+    old_prices, new_prices, amounts, percents, detected = [], [], [], [], []
     for change in changes:
-        data.append({
-            "Carrier": change.rate.carrier,
-            "Service": change.rate.service,
-            "Package": change.rate.package_name,
-            "Route": f"{change.rate.origin} → {change.rate.destination}",
-            "Old Price": change.old_price,
-            "New Price": change.new_price,
-            "Change": change.change_amount,
-            "Change %": change.change_percent,
-            "Detected At": change.detected_at,
-        })
+        rate = change.rate
+        carriers.append(rate.carrier)
+        services.append(rate.service)
+        packages.append(rate.package_name)
+        routes.append(rate.route)
+        old_prices.append(float(change.old_price))
+        new_prices.append(float(change.new_price))
+        amounts.append(float(change.change_amount))
+        percents.append(float(change.change_percent))
+        detected.append(change.detected_at)
+
+    return pd.DataFrame({
+        "Carrier": carriers,
+        "Service": services,
+        "Package": packages,
+        "Route": routes,
+        "Old Price": old_prices,
+        "New Price": new_prices,
+        "Change": amounts,
+        "Change %": percents,
+        "Detected At": detected,
+    }, copy=False).astype(CATEGORY_COLUMNS)
+
+
+@st.cache_data(ttl=SCRAPE_INTERVAL_SECONDS)
+def _history_df(version: str, days: int) -> pd.DataFrame:
+    """Build the rate history DataFrame (cached per data version)."""
+    historical = storage.get_historical_rates(days=days)
+
+    timestamps, carriers, services, packages, prices, routes = [], [], [], [], [], []
+    for entry in historical:
+        for rate_data in entry.get("rates", []):
+            timestamps.append(entry["timestamp"])
+            carriers.append(rate_data["carrier"])
+            services.append(rate_data["service"])
+            packages.append(rate_data["package_name"])
+            prices.append(float(rate_data["price"]))
+            routes.append(rate_data.get("route") or f"{rate_data['origin']} → {rate_data['destination']}")
+
+    if not timestamps:
+        return pd.DataFrame()
+
+    return pd.DataFrame({
+        "Timestamp": np.array(timestamps, dtype="datetime64[ns]"),
+        "Carrier": carriers,
+        "Service": services,
+        "Package": packages,
+        "Price": prices,
+        "Route": routes,
+    }, copy=False).astype(CATEGORY_COLUMNS)
+
+
+def get_current_rates_df() -> pd.DataFrame:
+    """Get current rates as a DataFrame."""
+    return _rates_df(_data_version())
+
+
+def get_changes_df(limit: int = 50) -> pd.DataFrame:
+    """Get recent rate changes as a DataFrame."""
+    return _changes_df(_data_version(), limit)
+
+
+@st.cache_data(ttl=SCRAPE_INTERVAL_SECONDS)
+def _change_counts(version: str) -> tuple:
+    """Stored (increases, decreases, total) change counts (cached per data version)."""
+    return storage.get_change_counts()
+
+
+def get_change_counts() -> tuple:
+    """Get (increases, decreases, total) over all stored rate changes."""
+    return _change_counts(_data_version())
+
+
+def get_history_df(days: int = 30) -> pd.DataFrame:
+    """Get rate history for the last N days as a DataFrame."""
+    return _history_df(_data_version(), days)
+
+
+def filter_selection(df: pd.DataFrame, carrier: str, package: str) -> pd.DataFrame:
+    """Rows matching the selected carrier and package ("All" matches any)."""
+    mask = np.ones(len(df), dtype=bool)
+    if carrier != "All":
+        mask &= (df["Carrier"] == carrier).to_numpy()
+    if package != "All":
+        mask &= (df["Package"] == package).to_numpy()
+
+    # Frames are only read downstream, so an unfiltered one is returned as is
+    return df if mask.all() else df[mask]
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Pick the row positions to keep when downsampling a series to
+    `threshold` points with Largest-Triangle-Three-Buckets.
+    `x` must be sorted ascending.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    # Bucket edges for the points between the fixed first and last ones
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    keep = np.empty(threshold, dtype=np.int64)
+    keep[0] = 0
+    keep[-1] = n - 1
+
+    prev = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+
+        # Area of the triangle (previous kept point, candidate, next bucket average)
+        area = np.abs(
+            (x[prev] - avg_x) * (y[start:end] - y[prev])
+            - (x[prev] - x[start:end]) * (avg_y - y[prev])
+        )
+        prev = start + int(area.argmax())
+        keep[i + 1] = prev
+
+    return keep
+
+
+def downsample_history(ts_df: pd.DataFrame, max_points: int = HISTORY_MAX_POINTS) -> pd.DataFrame:
+    """Cap each Service series at `max_points` rows for charting."""
+    if len(ts_df) <= max_points:
+        return ts_df
+
+    parts = []
+    for _, group in ts_df.groupby("Service", sort=False, observed=True):
+        if len(group) > max_points:
+            group = group.sort_values("Timestamp")
+            x = group["Timestamp"].to_numpy(dtype="datetime64[ns]").astype(np.int64).astype(np.float64)
+            y = group["Price"].to_numpy(dtype=np.float64)
+            group = group.iloc[lttb_indices(x, y, max_points)]
+        parts.append(group)
+
+    return pd.concat(parts)
+
+
+@st.cache_data(max_entries=64)
+def make_package_chart(package_name: str, package_df: pd.DataFrame) -> go.Figure:
+    """Bar chart comparing services for one package (cached per input)."""
+    fig = px.bar(
+        package_df.sort_values("Price"),
+        x="Service",
+        y="Price",
+        color="Carrier",
+        title=f"{package_name} Package Rates",
+        barmode="group",
+        hover_data=["Delivery Days", "Route"]
+    )
+    fig.update_layout(xaxis_tickangle=-45, height=400)
+    return fig
+
+
+@st.cache_data(max_entries=16)
+def make_history_chart(ts_df: pd.DataFrame) -> go.Figure:
+    """Line chart of rate history per service (cached per input)."""
+    fig = go.Figure()
+    for service, group in ts_df.groupby("Service", sort=True, observed=True):
+        fig.add_trace(go.Scattergl(
+            x=group["Timestamp"],
+            y=group["Price"],
+            mode="lines+markers",
+            name=service,
+            customdata=group[["Carrier", "Package", "Route"]].to_numpy(),
+            hovertemplate=(
+                "%{x}<br>Price: %{y}<br>Carrier: %{customdata[0]}"
+                "<br>Package: %{customdata[1]}<br>Route: %{customdata[2]}"
+                "<extra>%{fullData.name}</extra>"
+            ),
+        ))
+    fig.update_layout(
+        title="Rate History Over Time",
+        xaxis_title="Timestamp",
+        yaxis_title="Price",
+        legend_title_text="Service",
+        height=500,
+    )
+    return fig
+
+
+@st.cache_data(max_entries=16)
+def make_changes_chart(changes_by_carrier: pd.DataFrame) -> go.Figure:
+    """Bar chart of change counts per carrier (cached per input)."""
+    return px.bar(
+        changes_by_carrier,
+        x="Carrier",
+        y="Count",
+        color="Avg Change",
+        title="Rate Changes by Carrier",
+        color_continuous_scale=["green", "yellow", "red"],
+        color_continuous_midpoint=0
+    )
+
+
+@st.fragment(run_every=timedelta(seconds=60))
+def status_panel():
+    """Scheduler status metrics; reruns on its own every minute."""
+    status = scheduler.get_status()
+
+    if status["is_running"]:
+        st.success("🟢 Scheduler Running")
+    else:
+        st.error("🔴 Scheduler Stopped")
+
+    if status["last_run"]:
+        last_run = datetime.fromisoformat(status["last_run"])
+        st.metric("Last Scrape", last_run.strftime("%H:%M:%S"))
+
+    if status["next_run"]:
+        next_run = datetime.fromisoformat(status["next_run"])
+        time_until = next_run - datetime.now(next_run.tzinfo)
+        minutes = int(time_until.total_seconds() / 60)
+        st.metric("Next Scrape", f"in {minutes} min")
+
+    # A scrape finished since the page was built: rerun the whole app to show it
+    rendered_run = st.session_state.setdefault("rendered_last_run", status["last_run"])
+    if status["last_run"] != rendered_run:
+        st.session_state.rendered_last_run = status["last_run"]
+        st.rerun()
 
-    return pd.DataFrame(data)
 
+# Current rates, shared by the sidebar filters and the current rates view
+rates_df = get_current_rates_df()
 
 # Sidebar
 with st.sidebar:
@@ -126,22 +362,7 @@ with st.sidebar:
 
     # Status section
     st.subheader("Status")
-    status = scheduler.get_status()
-
-    if status["is_running"]:
-        st.success("🟢 Scheduler Running")
-    else:
-        st.error("🔴 Scheduler Stopped")
-
-    if status["last_run"]:
-        last_run = datetime.fromisoformat(status["last_run"])
-        st.metric("Last Scrape", last_run.strftime("%H:%M:%S"))
-
-    if status["next_run"]:
-        next_run = datetime.fromisoformat(status["next_run"])
-        time_until = next_run - datetime.now(next_run.tzinfo)
-        minutes = int(time_until.total_seconds() / 60)
-        st.metric("Next Scrape", f"in {minutes} min")
+    status_panel()
 
     st.markdown("---")
 
@@ -156,8 +377,6 @@ with st.sidebar:
     # Filters
     st.subheader("Filters")
 
-    rates_df = get_current_rates_df()
-
     if not rates_df.empty:
         carriers = ["All"] + sorted(rates_df["Carrier"].unique().tolist())
         selected_carrier = st.selectbox("Carrier", carriers)
@@ -181,25 +400,17 @@ else:
 
 st.markdown("Track shipping rates across carriers in real-time")
 
-# Tabs for different views
-tab1, tab2, tab3, tab4 = st.tabs(["📊 Current Rates", "📈 Rate History", "🔔 Rate Changes", "ℹ️ Status"])
+# View selector (only the selected view is rendered, so the others' data isn't loaded)
+active_tab = st.radio("View", VIEWS, horizontal=True, key="active_tab", label_visibility="collapsed")
 
-with tab1:
+if active_tab == TAB_CURRENT:
     st.header("Current Shipping Rates")
 
-    rates_df = get_current_rates_df()
-
     if rates_df.empty:
         st.info("No rate data available yet. The scraper will run shortly...")
     else:
         # Apply filters
-        filtered_df = rates_df.copy()
-
-        if selected_carrier != "All":
-            filtered_df = filtered_df[filtered_df["Carrier"] == selected_carrier]
-
-        if selected_package != "All":
-            filtered_df = filtered_df[filtered_df["Package"] == selected_package]
+        filtered_df = filter_selection(rates_df, selected_carrier, selected_package)
 
         # Summary metrics
         col1, col2, col3, col4 = st.columns(4)
@@ -238,29 +449,18 @@ with tab1:
             st.markdown(f"**{package.name} Package** ({package.dimensions_str}\", {package.weight} lb)")
 
             # Create comparison chart
-            fig = px.bar(
-                package_df.sort_values("Price"),
-                x="Service",
-                y="Price",
-                color="Carrier",
-                title=f"{package.name} Package Rates",
-                barmode="group",
-                hover_data=["Delivery Days", "Route"]
-            )
-            fig.update_layout(xaxis_tickangle=-45, height=400)
+            fig = make_package_chart(package.name, package_df)
             st.plotly_chart(fig, use_container_width=True)
 
         # Full data table
         st.subheader("All Rates")
 
-        display_df = filtered_df.copy()
-        display_df["Price"] = display_df["Price"].apply(lambda x: f"${x:.2f}")
-
         st.dataframe(
-            display_df,
+            filtered_df,
             use_container_width=True,
             hide_index=True,
             column_config={
+                "Price": st.column_config.NumberColumn("Price", format="$%.2f"),
                 "Last Updated": st.column_config.DatetimeColumn(
                     "Last Updated",
                     format="MMM DD, HH:mm"
@@ -269,80 +469,51 @@ with tab1:
         )
 
 
-with tab2:
+if active_tab == TAB_HISTORY:
     st.header("Rate History")
 
-    # Get historical data
-    historical = storage.get_historical_rates(days=30)
+    ts_df = get_history_df(days=30)
 
-    if not historical:
+    if ts_df.empty:
         st.info("No historical data available yet. Check back after a few scraping cycles.")
     else:
-        # Build time series data
-        time_series_data = []
-
-        for entry in historical:
-            for rate_data in entry.get("rates", []):
-                time_series_data.append({
-                    "Timestamp": entry["timestamp"],
-                    "Carrier": rate_data["carrier"],
-                    "Service": rate_data["service"],
-                    "Package": rate_data["package_name"],
-                    "Price": rate_data["price"],
-                    "Route": f"{rate_data['origin']} → {rate_data['destination']}"
-                })
-
-        if time_series_data:
-            ts_df = pd.DataFrame(time_series_data)
-            ts_df["Timestamp"] = pd.to_datetime(ts_df["Timestamp"])
-
-            # Filter options
-            col1, col2 = st.columns(2)
-
-            with col1:
-                hist_carriers = ["All"] + sorted(ts_df["Carrier"].unique().tolist())
-                hist_carrier = st.selectbox("Select Carrier", hist_carriers, key="hist_carrier")
-
-            with col2:
-                hist_packages = ["All"] + sorted(ts_df["Package"].unique().tolist())
-                hist_package = st.selectbox("Select Package", hist_packages, key="hist_package")
-
-            filtered_ts = ts_df.copy()
-
-            if hist_carrier != "All":
-                filtered_ts = filtered_ts[filtered_ts["Carrier"] == hist_carrier]
-
-            if hist_package != "All":
-                filtered_ts = filtered_ts[filtered_ts["Package"] == hist_package]
-
-            if not filtered_ts.empty:
-                # Create line chart
-                fig = px.line(
-                    filtered_ts,
-                    x="Timestamp",
-                    y="Price",
-                    color="Service",
-                    title="Rate History Over Time",
-                    markers=True,
-                    hover_data=["Carrier", "Package", "Route"]
-                )
-                fig.update_layout(height=500)
-                st.plotly_chart(fig, use_container_width=True)
-
-                # Show data table
-                st.subheader("Historical Data")
-                st.dataframe(
-                    filtered_ts.sort_values("Timestamp", ascending=False),
-                    use_container_width=True,
-                    hide_index=True
-                )
-            else:
-                st.info("No data matching the selected filters.")
+        # Filter options
+        col1, col2 = st.columns(2)
+
+        with col1:
+            hist_carriers = ["All"] + sorted(ts_df["Carrier"].unique().tolist())
+            hist_carrier = st.selectbox("Select Carrier", hist_carriers, key="hist_carrier")
+
+        with col2:
+            hist_packages = ["All"] + sorted(ts_df["Package"].unique().tolist())
+            hist_package = st.selectbox("Select Package", hist_packages, key="hist_package")
+
+        filtered_ts = filter_selection(ts_df, hist_carrier, hist_package)
+
+        if not filtered_ts.empty:
+            # Create line chart
+            fig = make_history_chart(downsample_history(filtered_ts))
+            st.plotly_chart(fig, use_container_width=True)
+
+            # Show data table
+            st.subheader("Historical Data")
+            st.dataframe(
+                filtered_ts.sort_values("Timestamp", ascending=False),
+                use_container_width=True,
+                hide_index=True,
+                column_config={
+                    "Price": st.column_config.NumberColumn("Price", format="$%.2f"),
+                    "Timestamp": st.column_config.DatetimeColumn(
+                        "Timestamp",
+                        format="MMM DD, HH:mm"
+                    )
+                }
+            )
         else:
-            st.info("No time series data available.")
+            st.info("No data matching the selected filters.")
 
 
-with tab3:
+if active_tab == TAB_CHANGES:
     st.header("Rate Changes")
 
     changes_df = get_changes_df()
@@ -353,16 +524,15 @@ with tab3:
         # Summary
         col1, col2, col3 = st.columns(3)
 
+        increases, decreases, total_changes = get_change_counts()
+
         with col1:
-            total_changes = len(changes_df)
             st.metric("Total Changes", total_changes)
 
         with col2:
-            increases = len(changes_df[changes_df["Change"] > 0])
             st.metric("Price Increases", increases, delta=f"{increases}", delta_color="inverse")
 
         with col3:
-            decreases = len(changes_df[changes_df["Change"] < 0])
             st.metric("Price Decreases", decreases, delta=f"{decreases}", delta_color="normal")
 
         st.markdown("---")
@@ -378,17 +548,15 @@ with tab3:
                     return "color: green"
             return ""
 
-        display_changes = changes_df.copy()
-        display_changes["Old Price"] = display_changes["Old Price"].apply(lambda x: f"${x:.2f}")
-        display_changes["New Price"] = display_changes["New Price"].apply(lambda x: f"${x:.2f}")
-        display_changes["Change"] = display_changes["Change"].apply(lambda x: f"${x:+.2f}")
-        display_changes["Change %"] = display_changes["Change %"].apply(lambda x: f"{x:+.1f}%")
-
         st.dataframe(
-            display_changes,
+            changes_df,
             use_container_width=True,
             hide_index=True,
             column_config={
+                "Old Price": st.column_config.NumberColumn("Old Price", format="$%.2f"),
+                "New Price": st.column_config.NumberColumn("New Price", format="$%.2f"),
+                "Change": st.column_config.NumberColumn("Change", format="$%+.2f"),
+                "Change %": st.column_config.NumberColumn("Change %", format="%+.1f%%"),
                 "Detected At": st.column_config.DatetimeColumn(
                     "Detected At",
                     format="MMM DD, HH:mm"
@@ -399,22 +567,16 @@ with tab3:
         # Change distribution chart
         st.subheader("Change Distribution by Carrier")
 
-        changes_by_carrier = changes_df.groupby("Carrier")["Change"].agg(["count", "mean"]).reset_index()
-        changes_by_carrier.columns = ["Carrier", "Count", "Avg Change"]
-
-        fig = px.bar(
-            changes_by_carrier,
-            x="Carrier",
-            y="Count",
-            color="Avg Change",
-            title="Rate Changes by Carrier",
-            color_continuous_scale=["green", "yellow", "red"],
-            color_continuous_midpoint=0
-        )
+        carriers, carrier_idx = np.unique(changes_df["Carrier"].to_numpy(), return_inverse=True)
+        counts = np.bincount(carrier_idx)
+        avg_change = np.bincount(carrier_idx, weights=changes_df["Change"].to_numpy()) / counts
+        changes_by_carrier = pd.DataFrame({"Carrier": carriers, "Count": counts, "Avg Change": avg_change})
+
+        fig = make_changes_chart(changes_by_carrier)
         st.plotly_chart(fig, use_container_width=True)
 
 
-with tab4:
+if active_tab == TAB_STATUS:
     st.header("System Status")
 
     status = scheduler.get_status()
@@ -452,8 +614,10 @@ with tab4:
     # Last scrape results
     st.subheader("Last Scrape Results")
 
-    if status["last_results"]:
-        for result in status["last_results"]:
+    last_results = scheduler.get_last_results()
+
+    if last_results:
+        for result in last_results:
             with st.expander(f"{result['carrier']} - {'✅ Success' if result['success'] else '❌ Failed'}"):
                 st.markdown(f"**Timestamp:** {result['timestamp']}")
                 st.markdown(f"**Rates Retrieved:** {len(result['rates'])}")
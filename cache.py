@@ -0,0 +1,91 @@
+"""Response cache shared across scrape runs (Redis when configured, else in-process)."""
+import asyncio
+import functools
+import logging
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from config import REDIS_URL, REDIS_TIMEOUT
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseCache:
+    """Bytes cache with optional per-key expiry."""
+
+    def __init__(self, redis_url: str = ""):
+        self._redis = None
+        self._redis_errors: Tuple[type, ...] = ()
+        self._local: Dict[str, Tuple[bytes, Optional[float]]] = {}
+        self._lock = threading.Lock()
+
+        if redis_url:
+            try:
+                # Optional dependency, only needed when REDIS_URL is set
+                import redis
+            except ImportError:
+                logger.warning("REDIS_URL is set but redis is not installed, caching in memory")
+            else:
+                # Bounded waits, so an unresponsive Redis degrades to cache misses instead of hanging
+                self._redis = redis.Redis.from_url(
+                    redis_url,
+                    socket_timeout=REDIS_TIMEOUT,
+                    socket_connect_timeout=REDIS_TIMEOUT,
+                )
+                self._redis_errors = (redis.RedisError,)
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Get a cached value, or None if missing or expired."""
+        if self._redis is not None:
+            try:
+                return self._redis.get(key)
+            except self._redis_errors as e:
+                logger.warning(f"Redis get failed for {key}: {e}")
+                return None
+
+        with self._lock:
+            entry = self._local.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._local[key]
+                return None
+            return value
+
+    async def get_async(self, key: str) -> Optional[bytes]:
+        """get() for coroutines: Redis round trips run in a worker thread, off the event loop."""
+        if self._redis is None:
+            return self.get(key)
+        return await asyncio.to_thread(self.get, key)
+
+    def set_many(self, items: List[Tuple[str, bytes, Optional[int]]]):
+        """Cache several (key, value, ttl) items at once, in one MULTI/EXEC round trip on Redis."""
+        if self._redis is not None:
+            try:
+                pipe = self._redis.pipeline(transaction=True)
+                for key, value, ttl in items:
+                    pipe.set(key, value, ex=ttl)
+                pipe.execute()
+            except self._redis_errors as e:
+                logger.warning(f"Redis pipelined set failed for {len(items)} keys: {e}")
+            return
+
+        now = time.monotonic()
+        with self._lock:
+            for key, value, ttl in items:
+                self._local[key] = (value, now + ttl if ttl else None)
+
+    async def set_many_async(self, items: List[Tuple[str, bytes, Optional[int]]]):
+        """set_many() for coroutines: the Redis pipeline runs in a worker thread, off the event loop."""
+        if self._redis is None:
+            self.set_many(items)
+            return
+        await asyncio.to_thread(self.set_many, items)
+
+
+@functools.lru_cache(maxsize=1)
+def get_response_cache() -> ResponseCache:
+    """Get the process-wide response cache."""
+    return ResponseCache(REDIS_URL)
@@ -13,10 +13,37 @@ os.makedirs(DATA_DIR, exist_ok=True)
 # Scraping interval in seconds (1 hour)
 SCRAPE_INTERVAL_SECONDS = 3600
 
+# Maximum points per series in history charts (larger series are downsampled)
+HISTORY_MAX_POINTS = 2000
+
 # Request settings
 REQUEST_TIMEOUT = 30
 MAX_RETRIES = 3
 RETRY_DELAY = 5
+MAX_RETRY_DELAY = 30
+
+# Connection pool caps for the shared aiohttp session
+MAX_CONNECTIONS = 64
+MAX_CONNECTIONS_PER_HOST = 8
+
+# Maximum in-flight (package, route) requests per scraper (one carrier host each)
+MAX_CONCURRENT_REQUESTS = MAX_CONNECTIONS_PER_HOST
+
+# Optional Redis URL for the shared response cache (in-process cache if unset)
+REDIS_URL = os.environ.get("REDIS_URL", "")
+
+# Seconds to wait on Redis before treating the cache as unavailable
+REDIS_TIMEOUT = 2
+
+# Seconds to reuse a USPS postage-calculator response
+USPS_CACHE_TTL = 6 * 3600
+
+# Outbound HTTP rate limit per carrier host (token bucket)
+RATE_LIMIT_PER_SECOND = 0.5
+RATE_LIMIT_BURST = 2
+
+# Seconds to reuse an identical live-API quote before requesting it again
+QUOTE_CACHE_TTL = 300
 
 # User agents for rotation
 USER_AGENTS = [
@@ -1,11 +1,10 @@
 """Data models for shipping rate monitor."""
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Optional, List
-import json
 
 
-@dataclass
+@dataclass(slots=True)
 class Rate:
     """Represents a shipping rate quote."""
     carrier: str
@@ -19,24 +18,44 @@ class Rate:
     currency: str
     delivery_days: Optional[int] = None
     timestamp: Optional[str] = None
+    route: str = field(init=False, repr=False, compare=False)
+    _key: str = field(init=False, repr=False, compare=False)
 
     def __post_init__(self):
         if self.timestamp is None:
             self.timestamp = datetime.now().isoformat()
+        self.route = f"{self.origin} → {self.destination}"
+        self._key = f"{self.carrier}|{self.service}|{self.package_name}|{self.origin}|{self.destination}"
 
     def to_dict(self) -> dict:
-        return asdict(self)
+        return {
+            "carrier": self.carrier,
+            "service": self.service,
+            "package_name": self.package_name,
+            "origin": self.origin,
+            "origin_country": self.origin_country,
+            "destination": self.destination,
+            "destination_country": self.destination_country,
+            "price": self.price,
+            "currency": self.currency,
+            "delivery_days": self.delivery_days,
+            "timestamp": self.timestamp,
+            "route": self.route,
+        }
 
     @classmethod
     def from_dict(cls, data: dict) -> "Rate":
+        if "route" in data or "_key" in data:
+            # Derived in __post_init__, not constructor arguments
+            data = {k: v for k, v in data.items() if k not in ("route", "_key")}
         return cls(**data)
 
     def rate_key(self) -> str:
         """Unique key for this rate (excluding price and timestamp)."""
-        return f"{self.carrier}|{self.service}|{self.package_name}|{self.origin}|{self.destination}"
+        return self._key  # Built once in __post_init__
 
 
-@dataclass
+@dataclass(slots=True)
 class RateChange:
     """Represents a change in shipping rate."""
     rate: Rate
@@ -1,4 +1,5 @@
 """Background scheduler for periodic rate scraping."""
+import asyncio
 import logging
 from datetime import datetime
 from typing import Callable, Optional, List
@@ -9,6 +10,7 @@ from apscheduler.triggers.interval import IntervalTrigger
 
 from config import SCRAPE_INTERVAL_SECONDS, ACTIVE_CARRIERS
 from scrapers import get_scraper, use_live_rates, get_live_scraper, get_live_rate_provider
+from scrapers.base import create_http_session
 from storage import StorageManager
 from models import Rate, RateChange, ScrapeResult
 
@@ -35,8 +37,40 @@ class RateScrapeScheduler:
         self.last_run: Optional[datetime] = None
         self.last_results: List[ScrapeResult] = []
         self.last_changes: List[RateChange] = []
+        self._results_cache: Optional[List[dict]] = None
         self._lock = threading.Lock()
 
+    async def _scrape_carrier(self, carrier_id: str, session) -> ScrapeResult:
+        """Scrape a single carrier, capturing any error in the result."""
+        try:
+            logger.info(f"Scraping {carrier_id}...")
+            scraper = get_scraper(carrier_id)
+            result = await scraper.scrape_all_async(session)
+
+            if result.success:
+                logger.info(f"Got {len(result.rates)} rates from {carrier_id}")
+            else:
+                logger.warning(f"Failed to scrape {carrier_id}: {result.error}")
+
+            return result
+
+        except Exception as e:
+            logger.error(f"Error scraping {carrier_id}: {e}")
+            return ScrapeResult(
+                timestamp=datetime.now().isoformat(),
+                carrier=carrier_id,
+                success=False,
+                rates=[],
+                error=str(e)
+            )
+
+    async def _scrape_carriers(self) -> List[ScrapeResult]:
+        """Scrape all active carriers concurrently over one HTTP session."""
+        async with create_http_session() as session:
+            return list(await asyncio.gather(
+                *(self._scrape_carrier(carrier_id, session) for carrier_id in ACTIVE_CARRIERS)
+            ))
+
     def _scrape_job(self):
         """The job that runs on schedule to scrape all carriers."""
         logger.info("Starting scheduled scrape job...")
@@ -70,30 +104,13 @@ class RateScrapeScheduler:
                     error=str(e)
                 ))
         else:
-            # Fall back to individual scrapers (estimated rates)
+            # Fall back to individual scrapers (estimated rates), all carriers at once
             logger.info("Using estimated rates (no live API key configured)")
-            for carrier_id in ACTIVE_CARRIERS:
-                try:
-                    logger.info(f"Scraping {carrier_id}...")
-                    scraper = get_scraper(carrier_id)
-                    result = scraper.scrape_all()
-                    results.append(result)
-
-                    if result.success:
-                        all_rates.extend(result.rates)
-                        logger.info(f"Got {len(result.rates)} rates from {carrier_id}")
-                    else:
-                        logger.warning(f"Failed to scrape {carrier_id}: {result.error}")
-
-                except Exception as e:
-                    logger.error(f"Error scraping {carrier_id}: {e}")
-                    results.append(ScrapeResult(
-                        timestamp=datetime.now().isoformat(),
-                        carrier=carrier_id,
-                        success=False,
-                        rates=[],
-                        error=str(e)
-                    ))
+            results = asyncio.run(self._scrape_carriers())
+
+            for result in results:
+                if result.success:
+                    all_rates.extend(result.rates)
 
         # Save rates and detect changes
         if all_rates:
@@ -106,6 +123,7 @@ class RateScrapeScheduler:
             self.last_run = datetime.now()
             self.last_results = results
             self.last_changes = all_changes
+            self._results_cache = None
 
         # Callbacks
         if self.on_complete:
@@ -155,7 +173,7 @@ class RateScrapeScheduler:
         threading.Thread(target=self._scrape_job, daemon=True).start()
 
     def get_status(self) -> dict:
-        """Get current scheduler status."""
+        """Get current scheduler status (metadata only, see get_last_results)."""
         with self._lock:
             next_run = None
             if self.is_running:
@@ -168,10 +186,18 @@ class RateScrapeScheduler:
                 "last_run": self.last_run.isoformat() if self.last_run else None,
                 "next_run": next_run.isoformat() if next_run else None,
                 "interval_seconds": self.interval_seconds,
-                "last_results": [r.to_dict() for r in self.last_results],
+                "last_result_count": len(self.last_results),
                 "recent_changes": [c.to_dict() for c in self.last_changes[-10:]],
             }
 
+    def get_last_results(self) -> List[dict]:
+        """Get the results of the last scrape run, including every rate."""
+        with self._lock:
+            # Serialized once per run; reset by _scrape_job when last_run changes
+            if self._results_cache is None:
+                self._results_cache = [r.to_dict() for r in self.last_results]
+            return self._results_cache
+
 
 # Singleton scheduler instance for use with Streamlit
 _scheduler_instance: Optional[RateScrapeScheduler] = None
@@ -1,5 +1,12 @@
 """Shipping rate scrapers."""
+import functools
+import importlib.util
 import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import List
+
+from models import ScrapeResult
 from scrapers.base import BaseScraper
 from scrapers.usps import USPSScraper
 from scrapers.ups import UPSScraper
@@ -14,18 +21,47 @@ SCRAPERS = {
 }
 
 
+def __getattr__(name: str):
+    """Lazily import the API-backed scrapers and their SDKs on first access."""
+    if name == "EasyPostScraper":
+        from scrapers.easypost_scraper import EasyPostScraper
+        return EasyPostScraper
+    if name == "ShippoScraper":
+        from scrapers.shippo_scraper import ShippoScraper
+        return ShippoScraper
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# Checked once so CLI runs without Streamlit never attempt the import
+_HAS_STREAMLIT = importlib.util.find_spec("streamlit") is not None
+
+
+@functools.lru_cache(maxsize=1)
+def _st_secrets():
+    """Get Streamlit secrets, importing Streamlit once per process."""
+    if not _HAS_STREAMLIT:
+        return None
+    import streamlit as st
+    return getattr(st, "secrets", None)
+
+
+@functools.lru_cache(maxsize=None)
 def get_api_key(key: str) -> str:
-    """Get API key from env var or Streamlit secrets (lazy loaded)."""
+    """
+    Get API key from env var or Streamlit secrets (lazy loaded).
+    Results are cached per key; call clear_api_key_cache() after changing them.
+    """
     # First check environment variable
     val = os.environ.get(key, "")
     if val:
         return val
     # Then check Streamlit secrets (for cloud deployment)
     try:
-        import streamlit as st
-        if hasattr(st, 'secrets') and key in st.secrets:
-            return st.secrets[key]
-    except Exception:
+        secrets = _st_secrets()
+        if secrets is not None and key in secrets:
+            return secrets[key]
+    except (FileNotFoundError, KeyError, AttributeError):
+        # No secrets.toml (StreamlitSecretNotFoundError is a FileNotFoundError)
         pass
     return ""
 
@@ -43,21 +79,47 @@ def get_all_scrapers():
     return [scraper_class() for scraper_class in SCRAPERS.values()]
 
 
+def _scrape_safely(scraper: BaseScraper) -> ScrapeResult:
+    """Run one scraper, capturing any error in the result."""
+    try:
+        return scraper.scrape_all()
+    except Exception as e:
+        return ScrapeResult(
+            timestamp=datetime.now().isoformat(),
+            carrier=scraper.carrier_name,
+            success=False,
+            rates=[],
+            error=str(e)
+        )
+
+
+def scrape_all_carriers() -> List[ScrapeResult]:
+    """Scrape every carrier at once, one worker thread per carrier."""
+    # Carriers talk to different hosts, so per-host throttling still holds
+    scrapers = get_all_scrapers()
+    with ThreadPoolExecutor(max_workers=len(scrapers)) as executor:
+        return list(executor.map(_scrape_safely, scrapers))
+
+
+@functools.lru_cache(maxsize=1)
 def use_live_rates() -> bool:
     """Check if any live rate API is configured."""
     return bool(get_api_key("EASYPOST_API_KEY") or get_api_key("SHIPPO_API_KEY"))
 
 
+@functools.lru_cache(maxsize=1)
 def use_easypost() -> bool:
     """Check if EasyPost API is configured."""
     return bool(get_api_key("EASYPOST_API_KEY"))
 
 
+@functools.lru_cache(maxsize=1)
 def use_shippo() -> bool:
     """Check if Shippo API is configured."""
     return bool(get_api_key("SHIPPO_API_KEY"))
 
 
+@functools.lru_cache(maxsize=1)
 def get_live_rate_provider() -> str:
     """Get which live rate provider is active."""
     if get_api_key("EASYPOST_API_KEY"):
@@ -67,6 +129,12 @@ def get_live_rate_provider() -> str:
     return None
 
 
+def clear_api_key_cache():
+    """Forget cached API keys, e.g. after the environment changes."""
+    for cached in (get_api_key, use_live_rates, use_easypost, use_shippo, get_live_rate_provider):
+        cached.cache_clear()
+
+
 def get_live_scraper():
     """Get the configured live rate scraper (EasyPost or Shippo)."""
     easypost_key = get_api_key("EASYPOST_API_KEY")
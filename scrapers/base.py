@@ -1,19 +1,35 @@
 """Base scraper class for shipping carriers."""
+import asyncio
 import random
+import threading
 import time
 from abc import ABC, abstractmethod
-from datetime import datetime
-from typing import List, Optional
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
 import logging
 
+import aiohttp
+import numpy as np
 import requests
-from requests.exceptions import RequestException
+from requests.adapters import HTTPAdapter
+from requests.exceptions import HTTPError, RequestException
 
 from config import (
     USER_AGENTS,
     REQUEST_TIMEOUT,
     MAX_RETRIES,
     RETRY_DELAY,
+    MAX_RETRY_DELAY,
+    MAX_CONCURRENT_REQUESTS,
+    MAX_CONNECTIONS,
+    MAX_CONNECTIONS_PER_HOST,
+    RATE_LIMIT_PER_SECOND,
+    RATE_LIMIT_BURST,
     Package,
     Route,
     PACKAGES,
@@ -24,6 +40,161 @@ from models import Rate, ScrapeResult
 logger = logging.getLogger(__name__)
 
 
+ACCEPT_HEADERS = MappingProxyType({
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.5",
+})
+
+
+# Client errors that will not succeed on retry
+UNRECOVERABLE_STATUSES = {400, 401, 403, 404}
+
+
+def _retry_delay(attempt: int, retry_after: str = None) -> float:
+    """
+    Seconds to wait before the next attempt.
+    Honors a Retry-After header, otherwise uses full-jitter exponential backoff.
+    """
+    if retry_after:
+        try:
+            return min(MAX_RETRY_DELAY, max(0.0, float(retry_after)))
+        except ValueError:
+            try:
+                wait = parsedate_to_datetime(retry_after) - datetime.now(timezone.utc)
+                return min(MAX_RETRY_DELAY, max(0.0, wait.total_seconds()))
+            except (TypeError, ValueError):
+                pass
+    return random.uniform(0, min(MAX_RETRY_DELAY, RETRY_DELAY * 2 ** attempt))
+
+
+class TokenBucket:
+    """Thread-safe token bucket shared by sync and async callers."""
+
+    def __init__(self, rate_per_sec: float, burst: int):
+        self.rate_per_sec = rate_per_sec
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take a token and return how many seconds to wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate_per_sec)
+            self._updated = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate_per_sec
+
+    def acquire(self):
+        """Block until a token is available."""
+        delay = self.reserve()
+        if delay:
+            time.sleep(delay)
+
+    async def acquire_async(self):
+        """Wait for a token without blocking the event loop."""
+        delay = self.reserve()
+        if delay:
+            await asyncio.sleep(delay)
+
+
+_BUCKETS: Dict[Tuple[str, str], TokenBucket] = {}
+_BUCKETS_LOCK = threading.Lock()
+
+
+def _get_bucket(carrier: str, url: str) -> TokenBucket:
+    """Get the rate limiter for a carrier's host, creating it on first use."""
+    key = (carrier, urlsplit(url).netloc)
+    with _BUCKETS_LOCK:
+        bucket = _BUCKETS.get(key)
+        if bucket is None:
+            bucket = _BUCKETS[key] = TokenBucket(RATE_LIMIT_PER_SECOND, RATE_LIMIT_BURST)
+        return bucket
+
+
+@dataclass(frozen=True, eq=False)
+class RateTable:
+    """Published per-service pricing for an estimated-rate carrier."""
+    services: tuple
+    bases: np.ndarray
+    per_lbs: np.ndarray
+    delivery_days: tuple
+    surcharge: float
+
+
+def _round_prices(prices: np.ndarray) -> list:
+    """Round to cents with Python's round(), matching the published rate-sheet math."""
+    # np.round scales by 100 first, which can land a half-cent tie on the other side
+    return [round(price, 2) for price in prices.tolist()]
+
+
+@lru_cache(maxsize=256)
+def _quote_rate_table(
+    table: RateTable, length: float, width: float, height: float, weight: float
+) -> tuple:
+    """Price every service in a rate table at once as (service, price, days)."""
+    # Dimensional weight
+    dim_weight = (length * width * height) / 139
+    billable_weight = max(weight, dim_weight)
+
+    # Surcharge applied last, as on the rate sheets: folding it into bases/per_lbs
+    # reorders the float math and moves some half-cent ties by a cent
+    prices = (table.bases + billable_weight * table.per_lbs) * table.surcharge
+    return tuple(zip(table.services, _round_prices(prices), table.delivery_days))
+
+
+# Billable weight of every tracked package, in PACKAGES order
+_PACKAGE_BILLABLE_WEIGHTS = np.maximum(
+    np.array([package.weight for package in PACKAGES]),
+    np.array([package.length * package.width * package.height for package in PACKAGES]) / 139,
+)
+
+
+@lru_cache(maxsize=None)
+def _quote_all_packages(table: RateTable) -> list:
+    """Quote every tracked package as (service, price, days) tuples, in PACKAGES order."""
+    prices = (
+        table.bases[None, :] + _PACKAGE_BILLABLE_WEIGHTS[:, None] * table.per_lbs[None, :]
+    ) * table.surcharge
+    # Fully evaluated once per table, so scrapes only build Rate objects
+    return [tuple(zip(table.services, _round_prices(row), table.delivery_days)) for row in prices]
+
+
+def _create_requests_session() -> requests.Session:
+    """Create the pooled keep-alive session shared by every scraper."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=32, pool_maxsize=32, max_retries=0)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({
+        **ACCEPT_HEADERS,
+        "Accept-Encoding": "gzip, deflate, br",
+        "Connection": "keep-alive",
+    })
+    return session
+
+
+_SESSION = _create_requests_session()
+
+
+def create_http_session() -> aiohttp.ClientSession:
+    """Create an aiohttp session to share across one scrape run's requests."""
+    # Not process-wide: a session is bound to its event loop, and each hourly run
+    # gets a fresh loop from asyncio.run() (servers drop idle connections long before then)
+    return aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(
+            limit=MAX_CONNECTIONS,
+            limit_per_host=MAX_CONNECTIONS_PER_HOST,
+            ttl_dns_cache=300,
+            keepalive_timeout=30,
+        ),
+        timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT),
+    )
+
+
 class BaseScraper(ABC):
     """Abstract base class for shipping rate scrapers."""
 
@@ -31,42 +202,37 @@ class BaseScraper(ABC):
     base_url: str = ""
 
     def __init__(self):
-        self.session = requests.Session()
-        self._update_headers()
-
-    def _update_headers(self):
-        """Update session headers with a random user agent."""
-        self.session.headers.update({
-            "User-Agent": random.choice(USER_AGENTS),
-            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
-            "Accept-Language": "en-US,en;q=0.5",
-            "Accept-Encoding": "gzip, deflate, br",
-            "Connection": "keep-alive",
-        })
+        self.session = _SESSION
 
     def _make_request(
         self,
         url: str,
         method: str = "GET",
+        params: dict = None,
         data: dict = None,
         json_data: dict = None,
         headers: dict = None,
     ) -> Optional[requests.Response]:
         """Make an HTTP request with retry logic."""
+        # Per-request headers; the session is shared across scrapers
+        request_headers = {"User-Agent": random.choice(USER_AGENTS), **(headers or {})}
+        bucket = _get_bucket(self.carrier_name, url)
+
         for attempt in range(MAX_RETRIES):
             try:
-                self._update_headers()  # Rotate user agent
-
-                if headers:
-                    self.session.headers.update(headers)
+                bucket.acquire()
 
                 if method.upper() == "GET":
-                    response = self.session.get(url, timeout=REQUEST_TIMEOUT)
+                    response = self.session.get(
+                        url, params=params, headers=request_headers, timeout=REQUEST_TIMEOUT
+                    )
                 elif method.upper() == "POST":
                     response = self.session.post(
                         url,
+                        params=params,
                         data=data,
                         json=json_data,
+                        headers=request_headers,
                         timeout=REQUEST_TIMEOUT
                     )
                 else:
@@ -75,12 +241,77 @@ class BaseScraper(ABC):
                 response.raise_for_status()
                 return response
 
+            except HTTPError as e:
+                status = e.response.status_code
+                if status in UNRECOVERABLE_STATUSES:
+                    logger.warning(f"{self.carrier_name} request failed, not retrying: {e}")
+                    return None
+                logger.warning(
+                    f"{self.carrier_name} request failed (attempt {attempt + 1}/{MAX_RETRIES}): {e}"
+                )
+                if attempt < MAX_RETRIES - 1:
+                    time.sleep(_retry_delay(attempt, e.response.headers.get("Retry-After")))
+
             except RequestException as e:
                 logger.warning(
                     f"{self.carrier_name} request failed (attempt {attempt + 1}/{MAX_RETRIES}): {e}"
                 )
                 if attempt < MAX_RETRIES - 1:
-                    time.sleep(RETRY_DELAY * (attempt + 1))
+                    time.sleep(_retry_delay(attempt))
+
+        return None
+
+    async def _make_request_async(
+        self,
+        session: aiohttp.ClientSession,
+        url: str,
+        method: str = "GET",
+        params: dict = None,
+        json_data: dict = None,
+        headers: dict = None,
+    ) -> Optional[bytes]:
+        """
+        Make an HTTP request on a shared aiohttp session with retry logic.
+        Returns the response body, or None if every attempt failed.
+        """
+        if method.upper() not in ("GET", "POST"):
+            raise ValueError(f"Unsupported HTTP method: {method}")
+
+        # aiohttp negotiates Accept-Encoding and keep-alive itself
+        request_headers = ACCEPT_HEADERS | {"User-Agent": random.choice(USER_AGENTS), **(headers or {})}
+        bucket = _get_bucket(self.carrier_name, url)
+
+        for attempt in range(MAX_RETRIES):
+            try:
+                await bucket.acquire_async()
+
+                async with session.request(
+                    method.upper(),
+                    url,
+                    params=params,
+                    json=json_data,
+                    headers=request_headers,
+                ) as response:
+                    response.raise_for_status()
+                    return await response.read()
+
+            except aiohttp.ClientResponseError as e:
+                if e.status in UNRECOVERABLE_STATUSES:
+                    logger.warning(f"{self.carrier_name} request failed, not retrying: {e}")
+                    return None
+                logger.warning(
+                    f"{self.carrier_name} request failed (attempt {attempt + 1}/{MAX_RETRIES}): {e}"
+                )
+                if attempt < MAX_RETRIES - 1:
+                    retry_after = e.headers.get("Retry-After") if e.headers else None
+                    await asyncio.sleep(_retry_delay(attempt, retry_after))
+
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logger.warning(
+                    f"{self.carrier_name} request failed (attempt {attempt + 1}/{MAX_RETRIES}): {e}"
+                )
+                if attempt < MAX_RETRIES - 1:
+                    await asyncio.sleep(_retry_delay(attempt))
 
         return None
 
@@ -93,25 +324,56 @@ class BaseScraper(ABC):
         """
         pass
 
-    def scrape_all(self) -> ScrapeResult:
-        """Scrape rates for all packages and routes."""
+    async def get_rate_async(
+        self,
+        package: Package,
+        route: Route,
+        session: aiohttp.ClientSession,
+    ) -> Optional[List[Rate]]:
+        """
+        Get shipping rates without blocking the event loop.
+        Scrapers that make HTTP requests override this to use `session`;
+        the default calls get_rate() directly, which suits the estimators.
+        """
+        return self.get_rate(package, route)
+
+    async def _get_rate_throttled(
+        self,
+        package: Package,
+        route: Route,
+        session: aiohttp.ClientSession,
+        semaphore: asyncio.Semaphore,
+    ) -> Optional[List[Rate]]:
+        """Get rates while holding a concurrency slot."""
+        # Outbound requests are rate limited per host in _make_request_async
+        async with semaphore:
+            return await self.get_rate_async(package, route, session)
+
+    async def scrape_all_async(self, session: aiohttp.ClientSession = None) -> ScrapeResult:
+        """Scrape rates for all packages and routes on the running event loop."""
+        if session is None:
+            async with create_http_session() as session:
+                return await self.scrape_all_async(session)
+
         timestamp = datetime.now().isoformat()
         all_rates = []
         errors = []
 
-        for package in PACKAGES:
-            for route in ROUTES:
-                try:
-                    rates = self.get_rate(package, route)
-                    if rates:
-                        all_rates.extend(rates)
-                except Exception as e:
-                    error_msg = f"Error scraping {package.name} on {route.name}: {e}"
-                    logger.error(error_msg)
-                    errors.append(error_msg)
+        # Fan out every (package, route) at once, bounded by the semaphore
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+        jobs = [(package, route) for package in PACKAGES for route in ROUTES]
+        results = await asyncio.gather(
+            *(self._get_rate_throttled(package, route, session, semaphore) for package, route in jobs),
+            return_exceptions=True,
+        )
 
-                # Rate limiting between requests
-                time.sleep(random.uniform(1, 3))
+        for (package, route), rates in zip(jobs, results):
+            if isinstance(rates, Exception):
+                error_msg = f"Error scraping {package.name} on {route.name}: {rates}"
+                logger.error(error_msg)
+                errors.append(error_msg)
+            elif rates:
+                all_rates.extend(rates)
 
         return ScrapeResult(
             timestamp=timestamp,
@@ -121,6 +383,10 @@ class BaseScraper(ABC):
             error="; ".join(errors) if errors else None
         )
 
+    def scrape_all(self) -> ScrapeResult:
+        """Scrape rates for all packages and routes."""
+        return asyncio.run(self.scrape_all_async())
+
     def _create_rate(
         self,
         service: str,
@@ -132,14 +398,77 @@ class BaseScraper(ABC):
     ) -> Rate:
         """Helper to create a Rate object."""
         return Rate(
-            carrier=self.carrier_name,
-            service=service,
-            package_name=package.name,
-            origin=route.origin_zip,
-            origin_country=route.origin_country,
-            destination=route.destination_zip,
-            destination_country=route.destination_country,
-            price=price,
-            currency=currency,
-            delivery_days=delivery_days,
+            self.carrier_name,
+            service,
+            package.name,
+            route.origin_zip,
+            route.origin_country,
+            route.destination_zip,
+            route.destination_country,
+            price,
+            currency,
+            delivery_days,
+        )
+
+    def _create_estimated_rates(
+        self,
+        package: Package,
+        route: Route,
+        table: RateTable,
+    ) -> List[Rate]:
+        """Create Rate objects for every service in a rate table."""
+        quotes = _quote_rate_table(
+            table, package.length, package.width, package.height, package.weight
+        )
+        # Fields shared by the whole batch are looked up once
+        carrier = self.carrier_name
+        package_name = package.name
+        origin, origin_country = route.origin_zip, route.origin_country
+        destination, destination_country = route.destination_zip, route.destination_country
+        timestamp = datetime.now().isoformat()
+        return [
+            Rate(
+                carrier, service, package_name, origin, origin_country,
+                destination, destination_country, price, "USD", days, timestamp,
+            )
+            for service, price, days in quotes
+        ]
+
+
+class EstimatedRateScraper(BaseScraper):
+    """Base class for carriers priced from published rate tables, with no network calls."""
+
+    @abstractmethod
+    def _rate_table(self, route: Route) -> RateTable:
+        """Get the rate table that applies to a route."""
+        pass
+
+    def get_rate(self, package: Package, route: Route) -> Optional[List[Rate]]:
+        """Get estimated rates for a package on a route."""
+        return self._create_estimated_rates(package, route, self._rate_table(route))
+
+    async def scrape_all_async(self, session: aiohttp.ClientSession = None) -> ScrapeResult:
+        """Price all packages and routes in one pass; `session` is unused."""
+        timestamp = datetime.now().isoformat()
+        carrier = self.carrier_name
+
+        # One price grid per route, covering every package at once
+        route_quotes = [(route, _quote_all_packages(self._rate_table(route))) for route in ROUTES]
+
+        all_rates = []
+        for i, package in enumerate(PACKAGES):
+            for route, quotes in route_quotes:
+                all_rates.extend(
+                    Rate(
+                        carrier, service, package.name, route.origin_zip, route.origin_country,
+                        route.destination_zip, route.destination_country, price, "USD", days, timestamp,
+                    )
+                    for service, price, days in quotes[i]
+                )
+
+        return ScrapeResult(
+            timestamp=timestamp,
+            carrier=carrier,
+            success=len(all_rates) > 0,
+            rates=all_rates,
         )
@@ -1,18 +1,43 @@
 """EasyPost API-based scraper for real shipping rates."""
-import os
-from typing import List, Optional
+import asyncio
+import threading
+from dataclasses import replace
+from types import MappingProxyType
+from typing import List
 from datetime import datetime
 import logging
 
-import easypost
+from cachetools import TTLCache
 
-from config import Package, Route, PACKAGES, ROUTES
+from config import Package, Route, PACKAGES, ROUTES, MAX_CONCURRENT_REQUESTS, QUOTE_CACHE_TTL
 from models import Rate, ScrapeResult
+from scrapers import get_api_key
 
 logger = logging.getLogger(__name__)
 
-# Get API key from environment or use test key
-EASYPOST_API_KEY = os.environ.get("EASYPOST_API_KEY", "")
+# Recent quotes, shared by every scraper instance and worker thread
+_QUOTE_CACHE = TTLCache(maxsize=512, ttl=QUOTE_CACHE_TTL)
+_QUOTE_LOCK = threading.Lock()
+
+# Placeholder street addresses; only zip and country vary per route
+_FROM_ADDRESS = MappingProxyType({"street1": "123 Main St", "city": "New York", "state": "NY"})
+_TO_ADDRESSES = {
+    "US": MappingProxyType({"street1": "456 Oak Ave", "city": "Los Angeles", "state": "CA"}),
+}
+_INTERNATIONAL_TO_ADDRESS = MappingProxyType({"street1": "456 Oak Ave", "city": "London", "state": ""})
+
+# EasyPost carrier codes mapped to our standard names
+_CARRIER_NAMES = {
+    "USPS": "USPS",
+    "UPS": "UPS",
+    "FedEx": "FedEx",
+    "FedExSmartPost": "FedEx",
+    "DHL": "DHL Express",
+    "DHLExpress": "DHL Express",
+    "DHLGlobalMail": "DHL",
+    "CanadaPost": "Canada Post",
+    "RoyalMail": "Royal Mail",
+}
 
 
 class EasyPostScraper:
@@ -21,33 +46,58 @@ class EasyPostScraper:
     carrier_name = "EasyPost"
 
     def __init__(self, api_key: str = None):
-        self.api_key = api_key or EASYPOST_API_KEY
+        self.api_key = api_key or get_api_key("EASYPOST_API_KEY")
         if self.api_key:
+            # Imported here so the SDK only loads when EasyPost is configured
+            import easypost
             self.client = easypost.EasyPostClient(self.api_key)
         else:
             self.client = None
             logger.warning("No EasyPost API key configured")
 
     def get_rates(self, package: Package, route: Route) -> List[Rate]:
-        """Get rates from all carriers via EasyPost."""
+        """
+        Get rates from all carriers via EasyPost.
+        Quotes for the same parcel and addresses are reused for QUOTE_CACHE_TTL seconds.
+        """
+        key = (
+            package.length, package.width, package.height, package.weight,
+            route.origin_zip, route.origin_country,
+            route.destination_zip, route.destination_country,
+        )
+        with _QUOTE_LOCK:
+            cached = _QUOTE_CACHE.get(key)
+        if cached is not None:
+            # Fresh copies: the cached Rates are shared across runs, and the same shape
+            # may be tracked under another package name
+            timestamp = datetime.now().isoformat()
+            return [replace(rate, package_name=package.name, timestamp=timestamp) for rate in cached]
+
+        rates = self._fetch_rates(package, route)
+        if rates:  # Failures come back empty and are not cached
+            with _QUOTE_LOCK:
+                _QUOTE_CACHE[key] = rates
+        return rates
+
+    def _fetch_rates(self, package: Package, route: Route) -> List[Rate]:
+        """Create an EasyPost shipment and convert its rates."""
         if not self.client:
             logger.error("EasyPost client not initialized - no API key")
             return []
 
+        import easypost  # Already loaded by __init__
+
         try:
             # Create shipment to get rates
+            to_template = _TO_ADDRESSES.get(route.destination_country, _INTERNATIONAL_TO_ADDRESS)
             shipment = self.client.shipment.create(
                 from_address={
-                    "street1": "123 Main St",
-                    "city": "New York",
-                    "state": "NY",
+                    **_FROM_ADDRESS,
                     "zip": route.origin_zip,
                     "country": route.origin_country,
                 },
                 to_address={
-                    "street1": "456 Oak Ave",
-                    "city": "Los Angeles" if route.destination_country == "US" else "London",
-                    "state": "CA" if route.destination_country == "US" else "",
+                    **to_template,
                     "zip": route.destination_zip,
                     "country": route.destination_country,
                 },
@@ -88,36 +138,43 @@ class EasyPostScraper:
 
     def _normalize_carrier(self, carrier: str) -> str:
         """Normalize carrier names."""
-        carrier_map = {
-            "USPS": "USPS",
-            "UPS": "UPS",
-            "FedEx": "FedEx",
-            "FedExSmartPost": "FedEx",
-            "DHL": "DHL Express",
-            "DHLExpress": "DHL Express",
-            "DHLGlobalMail": "DHL",
-            "CanadaPost": "Canada Post",
-            "RoyalMail": "Royal Mail",
-        }
-        return carrier_map.get(carrier, carrier)
-
-    def scrape_all(self) -> ScrapeResult:
-        """Scrape rates for all packages and routes."""
+        return _CARRIER_NAMES.get(carrier, carrier)
+
+    async def _get_rates_limited(
+        self,
+        package: Package,
+        route: Route,
+        semaphore: asyncio.Semaphore,
+    ) -> List[Rate]:
+        """Get rates on a worker thread while holding a concurrency slot."""
+        async with semaphore:
+            # The API call blocks, so keep it off the event loop
+            return await asyncio.to_thread(self.get_rates, package, route)
+
+    async def scrape_all_async(self) -> ScrapeResult:
+        """Scrape rates for all packages and routes concurrently."""
         timestamp = datetime.now().isoformat()
         all_rates = []
         errors = []
 
-        for package in PACKAGES:
-            for route in ROUTES:
-                try:
-                    rates = self.get_rates(package, route)
-                    if rates:
-                        all_rates.extend(rates)
-                        logger.info(f"Got {len(rates)} rates for {package.name} on {route.name}")
-                except Exception as e:
-                    error_msg = f"Error getting rates for {package.name} on {route.name}: {e}"
-                    logger.error(error_msg)
-                    errors.append(error_msg)
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+        jobs = [(package, route) for package in PACKAGES for route in ROUTES]
+        results = await asyncio.gather(
+            *(self._get_rates_limited(package, route, semaphore) for package, route in jobs),
+            return_exceptions=True,
+        )
+
+        # Skip formatting per-package progress lines when INFO is off
+        log_progress = logger.isEnabledFor(logging.INFO)
+        for (package, route), rates in zip(jobs, results):
+            if isinstance(rates, Exception):
+                error_msg = f"Error getting rates for {package.name} on {route.name}: {rates}"
+                logger.error(error_msg)
+                errors.append(error_msg)
+            elif rates:
+                all_rates.extend(rates)
+                if log_progress:
+                    logger.info("Got %d rates for %s on %s", len(rates), package.name, route.name)
 
         return ScrapeResult(
             timestamp=timestamp,
@@ -127,9 +184,6 @@ class EasyPostScraper:
             error="; ".join(errors) if errors else None
         )
 
-
-def get_easypost_scraper() -> Optional[EasyPostScraper]:
-    """Get an EasyPost scraper if API key is configured."""
-    if EASYPOST_API_KEY:
-        return EasyPostScraper(EASYPOST_API_KEY)
-    return None
+    def scrape_all(self) -> ScrapeResult:
+        """Scrape rates for all packages and routes."""
+        return asyncio.run(self.scrape_all_async())
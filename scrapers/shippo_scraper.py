@@ -1,21 +1,47 @@
 """Shippo API-based scraper for real shipping rates."""
-import os
-from typing import List, Optional
+import asyncio
+import threading
+from dataclasses import replace
+from types import MappingProxyType
+from typing import List
 from datetime import datetime
 import logging
 
+import orjson
 import requests
+from cachetools import TTLCache
 
-from config import Package, Route, PACKAGES, ROUTES
+from config import Package, Route, PACKAGES, ROUTES, MAX_CONCURRENT_REQUESTS, QUOTE_CACHE_TTL
 from models import Rate, ScrapeResult
+from scrapers import get_api_key
 
 logger = logging.getLogger(__name__)
 
-# Get API key from environment
-SHIPPO_API_KEY = os.environ.get("SHIPPO_API_KEY", "")
+# Recent quotes, shared by every scraper instance and worker thread
+_QUOTE_CACHE = TTLCache(maxsize=512, ttl=QUOTE_CACHE_TTL)
+_QUOTE_LOCK = threading.Lock()
 
 SHIPPO_API_URL = "https://api.goshippo.com/shipments/"
 
+# Placeholder street addresses; only zip and country vary per route
+_FROM_ADDRESS = MappingProxyType({"street1": "123 Main St", "city": "New York", "state": "NY"})
+_TO_ADDRESSES = {
+    "US": MappingProxyType({"street1": "456 Oak Ave", "city": "Los Angeles", "state": "CA"}),
+}
+_INTERNATIONAL_TO_ADDRESS = MappingProxyType({"street1": "10 Downing St", "city": "London"})
+
+# Shippo carrier codes mapped to our standard names
+_CARRIER_NAMES = {
+    "usps": "USPS",
+    "ups": "UPS",
+    "fedex": "FedEx",
+    "dhl_express": "DHL Express",
+    "dhl_ecommerce": "DHL",
+    "canada_post": "Canada Post",
+    "royal_mail": "Royal Mail",
+    "australia_post": "Australia Post",
+}
+
 
 class ShippoScraper:
     """Scraper that uses Shippo API for real carrier rates."""
@@ -23,12 +49,36 @@ class ShippoScraper:
     carrier_name = "Shippo"
 
     def __init__(self, api_key: str = None):
-        self.api_key = api_key or SHIPPO_API_KEY
+        self.api_key = api_key or get_api_key("SHIPPO_API_KEY")
         if not self.api_key:
             logger.warning("No Shippo API key configured")
 
     def get_rates(self, package: Package, route: Route) -> List[Rate]:
-        """Get rates from all carriers via Shippo."""
+        """
+        Get rates from all carriers via Shippo.
+        Quotes for the same parcel and addresses are reused for QUOTE_CACHE_TTL seconds.
+        """
+        key = (
+            package.length, package.width, package.height, package.weight,
+            route.origin_zip, route.origin_country,
+            route.destination_zip, route.destination_country,
+        )
+        with _QUOTE_LOCK:
+            cached = _QUOTE_CACHE.get(key)
+        if cached is not None:
+            # Fresh copies: the cached Rates are shared across runs, and the same shape
+            # may be tracked under another package name
+            timestamp = datetime.now().isoformat()
+            return [replace(rate, package_name=package.name, timestamp=timestamp) for rate in cached]
+
+        rates = self._fetch_rates(package, route)
+        if rates:  # Failures come back empty and are not cached
+            with _QUOTE_LOCK:
+                _QUOTE_CACHE[key] = rates
+        return rates
+
+    def _fetch_rates(self, package: Package, route: Route) -> List[Rate]:
+        """Create a Shippo shipment and convert its rates."""
         if not self.api_key:
             logger.error("Shippo client not initialized - no API key")
             return []
@@ -36,28 +86,15 @@ class ShippoScraper:
         try:
             # Create address objects
             address_from = {
-                "street1": "123 Main St",
-                "city": "New York",
-                "state": "NY",
+                **_FROM_ADDRESS,
                 "zip": route.origin_zip,
                 "country": route.origin_country,
             }
-
-            if route.destination_country == "US":
-                address_to = {
-                    "street1": "456 Oak Ave",
-                    "city": "Los Angeles",
-                    "state": "CA",
-                    "zip": route.destination_zip,
-                    "country": route.destination_country,
-                }
-            else:
-                address_to = {
-                    "street1": "10 Downing St",
-                    "city": "London",
-                    "zip": route.destination_zip,
-                    "country": route.destination_country,
-                }
+            address_to = {
+                **_TO_ADDRESSES.get(route.destination_country, _INTERNATIONAL_TO_ADDRESS),
+                "zip": route.destination_zip,
+                "country": route.destination_country,
+            }
 
             # Create parcel
             parcel = {
@@ -84,7 +121,7 @@ class ShippoScraper:
 
             response = requests.post(SHIPPO_API_URL, json=payload, headers=headers, timeout=30)
             response.raise_for_status()
-            shipment = response.json()
+            shipment = orjson.loads(response.content)
 
             rates = []
             for rate in shipment.get("rates", []):
@@ -113,35 +150,44 @@ class ShippoScraper:
 
     def _normalize_carrier(self, carrier: str) -> str:
         """Normalize carrier names."""
-        carrier_map = {
-            "usps": "USPS",
-            "ups": "UPS",
-            "fedex": "FedEx",
-            "dhl_express": "DHL Express",
-            "dhl_ecommerce": "DHL",
-            "canada_post": "Canada Post",
-            "royal_mail": "Royal Mail",
-            "australia_post": "Australia Post",
-        }
-        return carrier_map.get(carrier.lower(), carrier)
-
-    def scrape_all(self) -> ScrapeResult:
-        """Scrape rates for all packages and routes."""
+        # Shippo codes are usually lowercase already; skip lower() on a hit
+        return _CARRIER_NAMES.get(carrier) or _CARRIER_NAMES.get(carrier.lower(), carrier)
+
+    async def _get_rates_limited(
+        self,
+        package: Package,
+        route: Route,
+        semaphore: asyncio.Semaphore,
+    ) -> List[Rate]:
+        """Get rates on a worker thread while holding a concurrency slot."""
+        async with semaphore:
+            # The API call blocks, so keep it off the event loop
+            return await asyncio.to_thread(self.get_rates, package, route)
+
+    async def scrape_all_async(self) -> ScrapeResult:
+        """Scrape rates for all packages and routes concurrently."""
         timestamp = datetime.now().isoformat()
         all_rates = []
         errors = []
 
-        for package in PACKAGES:
-            for route in ROUTES:
-                try:
-                    rates = self.get_rates(package, route)
-                    if rates:
-                        all_rates.extend(rates)
-                        logger.info(f"Got {len(rates)} rates for {package.name} on {route.name}")
-                except Exception as e:
-                    error_msg = f"Error getting rates for {package.name} on {route.name}: {e}"
-                    logger.error(error_msg)
-                    errors.append(error_msg)
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+        jobs = [(package, route) for package in PACKAGES for route in ROUTES]
+        results = await asyncio.gather(
+            *(self._get_rates_limited(package, route, semaphore) for package, route in jobs),
+            return_exceptions=True,
+        )
+
+        # Skip formatting per-package progress lines when INFO is off
+        log_progress = logger.isEnabledFor(logging.INFO)
+        for (package, route), rates in zip(jobs, results):
+            if isinstance(rates, Exception):
+                error_msg = f"Error getting rates for {package.name} on {route.name}: {rates}"
+                logger.error(error_msg)
+                errors.append(error_msg)
+            elif rates:
+                all_rates.extend(rates)
+                if log_progress:
+                    logger.info("Got %d rates for %s on %s", len(rates), package.name, route.name)
 
         return ScrapeResult(
             timestamp=timestamp,
@@ -151,9 +197,6 @@ class ShippoScraper:
             error="; ".join(errors) if errors else None
         )
 
-
-def get_shippo_scraper() -> Optional[ShippoScraper]:
-    """Get a Shippo scraper if API key is configured."""
-    if SHIPPO_API_KEY:
-        return ShippoScraper(SHIPPO_API_KEY)
-    return None
+    def scrape_all(self) -> ScrapeResult:
+        """Scrape rates for all packages and routes."""
+        return asyncio.run(self.scrape_all_async())
@@ -1,13 +1,37 @@
 """USPS shipping rate scraper."""
+import hashlib
+import logging
 import re
 from typing import List, Optional
 from bs4 import BeautifulSoup
-import json
 
+import aiohttp
+import orjson
+
+from cache import get_response_cache
 from scrapers.base import BaseScraper
-from config import Package, Route
+from config import Package, Route, USPS_CACHE_TTL
 from models import Rate
 
+logger = logging.getLogger(__name__)
+
+# First run of digits in a delivery description, e.g. "2 Days"
+_DAYS_RE = re.compile(r"\d+")
+
+
+def _cache_key(params: dict) -> str:
+    """Cache key for a postage calculator query."""
+    digest = hashlib.blake2b(orjson.dumps(params, option=orjson.OPT_SORT_KEYS), digest_size=16).hexdigest()
+    return f"usps:dom:{digest}"
+
+
+def _cache_items(key: str, body: bytes) -> list:
+    """Cache writes for a good calculator response: a fresh copy and a stale fallback."""
+    return [
+        (key, body, USPS_CACHE_TTL),
+        (key + ":stale", body, None),  # Kept without expiry for outages
+    ]
+
 
 class USPSScraper(BaseScraper):
     """Scraper for USPS shipping rates using their public calculator."""
@@ -17,8 +41,6 @@ class USPSScraper(BaseScraper):
 
     def get_rate(self, package: Package, route: Route) -> Optional[List[Rate]]:
         """Get USPS rates for a package on a route."""
-        rates = []
-
         # USPS only handles US domestic and US-origin international
         if route.origin_country != "US":
             return None
@@ -28,12 +50,104 @@ class USPSScraper(BaseScraper):
         else:
             return self._get_international_rates(package, route)
 
+    async def get_rate_async(
+        self,
+        package: Package,
+        route: Route,
+        session: aiohttp.ClientSession,
+    ) -> Optional[List[Rate]]:
+        """Get USPS rates for a package on a route without blocking the event loop."""
+        if route.origin_country != "US":
+            return None
+
+        if route.destination_country == "US":
+            return await self._get_domestic_rates_async(package, route, session)
+        else:
+            return self._get_international_rates(package, route)
+
     def _get_domestic_rates(self, package: Package, route: Route) -> Optional[List[Rate]]:
         """Get domestic USPS rates."""
+        params = self._domestic_params(package, route)
+        key = _cache_key(params)
+        rates = self._get_cached_domestic_rates(key, package, route)
+        if rates:
+            return rates
+
         # Use the USPS postage calculator API endpoint
-        url = f"{self.base_url}/Calculator/GetMailServices"
+        response = self._make_request(
+            f"{self.base_url}/Calculator/GetMailServices",
+            method="GET",
+            params=params,
+            headers={"Accept": "application/json"}
+        )
+
+        return self._rates_from_response(response.content if response else None, key, package, route)
+
+    async def _get_domestic_rates_async(
+        self,
+        package: Package,
+        route: Route,
+        session: aiohttp.ClientSession,
+    ) -> Optional[List[Rate]]:
+        """Get domestic USPS rates over a shared aiohttp session."""
+        params = self._domestic_params(package, route)
+        key = _cache_key(params)
+        cache = get_response_cache()
+        cached = await cache.get_async(key)
+        rates = self._parse_domestic_rates(cached, package, route) if cached else []
+        if rates:
+            return rates
+
+        body = await self._make_request_async(
+            session,
+            f"{self.base_url}/Calculator/GetMailServices",
+            method="GET",
+            params=params,
+            headers={"Accept": "application/json"}
+        )
+
+        rates = self._parse_domestic_rates(body, package, route) if body else []
+        if rates:
+            await cache.set_many_async(_cache_items(key, body))
+            return rates
+        return self._fallback_rates(await cache.get_async(key + ":stale"), package, route)
+
+    def _get_cached_domestic_rates(self, key: str, package: Package, route: Route) -> List[Rate]:
+        """Parse a fresh cached calculator response, if there is one."""
+        body = get_response_cache().get(key)
+        return self._parse_domestic_rates(body, package, route) if body else []
 
-        params = {
+    def _rates_from_response(
+        self,
+        body: Optional[bytes],
+        key: str,
+        package: Package,
+        route: Route,
+    ) -> List[Rate]:
+        """
+        Parse and cache a calculator response.
+        Falls back to the last good response, then to estimated rates.
+        """
+        cache = get_response_cache()
+        rates = self._parse_domestic_rates(body, package, route) if body else []
+        if rates:
+            cache.set_many(_cache_items(key, body))
+            return rates
+        return self._fallback_rates(cache.get(key + ":stale"), package, route)
+
+    def _fallback_rates(self, stale: Optional[bytes], package: Package, route: Route) -> List[Rate]:
+        """Rates from the last good response, else estimated rates."""
+        if stale:
+            rates = self._parse_domestic_rates(stale, package, route)
+            if rates:
+                logger.warning(f"USPS unavailable, using cached rates for {package.name} on {route.name}")
+                return rates
+
+        return self._get_estimated_domestic_rates(package, route)
+
+    def _domestic_params(self, package: Package, route: Route) -> dict:
+        """Query parameters for the postage calculator."""
+        return {
             "client_ip": "127.0.0.1",
             "countrycode": "US",
             "dpb": "0",
@@ -53,17 +167,10 @@ class USPSScraper(BaseScraper):
             "width": str(package.width),
         }
 
-        response = self._make_request(
-            url,
-            method="GET",
-            headers={"Accept": "application/json"}
-        )
-
-        if not response:
-            return self._get_estimated_domestic_rates(package, route)
-
+    def _parse_domestic_rates(self, body: bytes, package: Package, route: Route) -> List[Rate]:
+        """Parse a postage calculator response; empty if it has no usable rates."""
         try:
-            data = response.json()
+            data = orjson.loads(body)
             rates = []
 
             for service in data.get("MailServices", []):
@@ -82,10 +189,10 @@ class USPSScraper(BaseScraper):
                         delivery_days=delivery_days
                     ))
 
-            return rates if rates else self._get_estimated_domestic_rates(package, route)
+            return rates
 
-        except (json.JSONDecodeError, KeyError):
-            return self._get_estimated_domestic_rates(package, route)
+        except (orjson.JSONDecodeError, KeyError):
+            return []
 
     def _get_international_rates(self, package: Package, route: Route) -> Optional[List[Rate]]:
         """Get international USPS rates."""
@@ -149,7 +256,5 @@ class USPSScraper(BaseScraper):
         if not delivery_desc:
             return None
 
-        match = re.search(r"(\d+)", delivery_desc)
-        if match:
-            return int(match.group(1))
-        return None
+        match = _DAYS_RE.search(delivery_desc)
+        return int(match.group()) if match else None
@@ -1,60 +1,330 @@
-"""JSON file storage manager with change detection."""
-import json
-import os
+"""SQLite storage manager with change detection."""
+import mmap
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
 from datetime import datetime, timedelta
+from itertools import groupby
 from typing import List, Dict, Optional, Tuple
 from pathlib import Path
 
+import numpy as np
+import orjson
+
 from config import DATA_DIR
 from models import Rate, RateChange
 
+# Rate changes kept for display and counts
+MAX_CHANGES = 1000
+
+# Rates not quoted within this many days drop out of the latest rates
+LATEST_WINDOW_DAYS = 7
+
+# Bounds (seconds) on how long the latest-rate cache goes between checks for other writers
+LATEST_TTL_MIN = 1.0
+LATEST_TTL_MAX = 60.0
+
+# PRAGMA user_version once the pre-SQLite files have been imported
+MIGRATED_VERSION = 1
+
+# Rate fields stored as columns, in Rate constructor order
+RATE_COLUMNS = (
+    "carrier", "service", "package_name", "origin", "origin_country",
+    "destination", "destination_country", "price", "currency", "delivery_days", "timestamp",
+)
+
+# One rates row per stored observation (saved_at is the save batch time), and
+# the newest of them per rate key in latest; changes are trimmed by trigger
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS rates (
+    carrier TEXT NOT NULL,
+    service TEXT NOT NULL,
+    package_name TEXT NOT NULL,
+    origin TEXT NOT NULL,
+    origin_country TEXT,
+    destination TEXT NOT NULL,
+    destination_country TEXT,
+    price REAL NOT NULL,
+    currency TEXT,
+    delivery_days INTEGER,
+    timestamp TEXT,
+    saved_at TEXT NOT NULL,
+    PRIMARY KEY (carrier, service, package_name, origin, destination, saved_at)
+);
+CREATE INDEX IF NOT EXISTS rates_saved_at ON rates (saved_at);
+CREATE INDEX IF NOT EXISTS rates_history ON rates (carrier, service, package_name, saved_at);
+
+CREATE TABLE IF NOT EXISTS latest (
+    carrier TEXT NOT NULL,
+    service TEXT NOT NULL,
+    package_name TEXT NOT NULL,
+    origin TEXT NOT NULL,
+    origin_country TEXT,
+    destination TEXT NOT NULL,
+    destination_country TEXT,
+    price REAL NOT NULL,
+    currency TEXT,
+    delivery_days INTEGER,
+    timestamp TEXT,
+    saved_at TEXT NOT NULL,
+    PRIMARY KEY (carrier, service, package_name, origin, destination)
+);
+
+CREATE TABLE IF NOT EXISTS changes (
+    id INTEGER PRIMARY KEY,
+    rate BLOB NOT NULL,
+    old_price REAL NOT NULL,
+    new_price REAL NOT NULL,
+    change_amount REAL NOT NULL,
+    change_percent REAL NOT NULL,
+    detected_at TEXT NOT NULL
+);
+CREATE TRIGGER IF NOT EXISTS changes_retention AFTER INSERT ON changes BEGIN
+    DELETE FROM changes WHERE id <= NEW.id - {MAX_CHANGES};
+END;
+"""
+
+INSERT_RATE = f"INSERT OR REPLACE INTO rates VALUES ({', '.join('?' * (len(RATE_COLUMNS) + 1))})"
+INSERT_LATEST = INSERT_RATE.replace("INTO rates", "INTO latest")
+INSERT_CHANGE = (
+    "INSERT INTO changes (rate, old_price, new_price, change_amount, change_percent, detected_at)"
+    " VALUES (?, ?, ?, ?, ?, ?)"
+)
+
+
+@contextmanager
+def _mapped(filepath: Path):
+    """Map a file read-only, yielding a memoryview over it (empty for an empty file)."""
+    with open(filepath, "rb") as f:
+        if not f.seek(0, 2):
+            yield memoryview(b"")  # mmap can't map zero bytes
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+            yield view
+
+
+def _rate_row(rate: Rate, saved_at: str) -> tuple:
+    """A rates table row for a rate saved at `saved_at`."""
+    return (
+        rate.carrier, rate.service, rate.package_name, rate.origin, rate.origin_country,
+        rate.destination, rate.destination_country, rate.price, rate.currency,
+        rate.delivery_days, rate.timestamp, saved_at,
+    )
+
+
+def _change_row(change) -> tuple:
+    """A changes table row for a RateChange (or its dict form)."""
+    if isinstance(change, dict):
+        change = RateChange(**{**change, "rate": Rate.from_dict(change["rate"])})
+    return (
+        orjson.dumps(change.rate), change.old_price, change.new_price,
+        change.change_amount, change.change_percent, change.detected_at,
+    )
+
 
 class StorageManager:
-    """Manages JSON file storage for shipping rates."""
+    """Manages SQLite storage for shipping rates and rate changes."""
 
     def __init__(self, data_dir: str = DATA_DIR):
         self.data_dir = Path(data_dir)
         self.data_dir.mkdir(parents=True, exist_ok=True)
-
-    def _get_file_path(self, date: datetime = None) -> Path:
-        """Get the file path for a specific date."""
-        if date is None:
-            date = datetime.now()
-        filename = date.strftime("%Y-%m-%d") + ".json"
-        return self.data_dir / filename
-
-    def _load_file(self, filepath: Path) -> Dict:
-        """Load data from a JSON file."""
+        # Latest rate per key, loaded from disk once and kept current by save_rates()
+        self._latest_cache: Optional[Dict[str, Rate]] = None
+        # Latest price per key in whole cents, to skip unchanged rates cheaply
+        self._last_seen: Dict[str, int] = {}
+        # When to next check the database for writes from other processes
+        self._latest_ttl = LATEST_TTL_MIN
+        self._latest_checked_at = 0.0
+        self._latest_data_version: Optional[int] = None
+        self._latest_lock = threading.Lock()
+
+        self.db_path = self.data_dir / "rates.sqlite"
+        self._db_lock = threading.Lock()
+        self._init_db()
+
+    def _read_json(self, filepath: Path) -> Dict:
+        """Load a JSON document, parsing straight from a memory map of the file."""
+        with _mapped(filepath) as view:
+            return orjson.loads(view) if view else {}
+
+    def _read_lines(self, filepath: Path) -> List[Dict]:
+        """Load every record from a JSONL file."""
         if not filepath.exists():
-            return {"entries": []}
-        with open(filepath, "r") as f:
-            return json.load(f)
+            return []
 
-    def _save_file(self, filepath: Path, data: Dict):
-        """Save data to a JSON file."""
-        with open(filepath, "w") as f:
-            json.dump(data, f, indent=2)
+        records = []
+        with _mapped(filepath) as view:
+            data = view.obj
+            start, size = 0, len(view)
+            # Parse each line in place from the map, no per-line bytes copies
+            while start < size:
+                end = data.find(b"\n", start)
+                if end == -1:
+                    end = size
+                if end > start:
+                    records.append(orjson.loads(view[start:end]))
+                start = end + 1
+        return records
+
+    def _load_entries(self, day: str) -> List[Dict]:
+        """Load a day's rate entries (day as YYYY-MM-DD), oldest first."""
+        entries = []
+
+        # Files written before the JSONL format hold a single JSON document
+        legacy_path = self.data_dir / f"{day}.json"
+        if legacy_path.exists():
+            entries.extend(self._read_json(legacy_path).get("entries", []))
+
+        entries.extend(self._read_lines(self.data_dir / f"{day}.jsonl"))
+        return entries
+
+    def _init_db(self):
+        """Open the database, migrating existing JSON/JSONL files into it until that succeeds."""
+        # One connection per manager, shared across threads under _db_lock
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        if self._conn.execute("PRAGMA user_version").fetchone()[0] < MIGRATED_VERSION:
+            self._migrate_files()
+        self._backfill_latest()
+
+    def _migrate_files(self):
+        """Import rates and changes from the day files and changes log used before SQLite."""
+        days = sorted({path.name[:10] for path in self.data_dir.glob("????-??-??.json*")})
+        changes = []
+        legacy_file = self.data_dir / "changes.json"
+        if legacy_file.exists():
+            changes.extend(self._read_json(legacy_file).get("changes", []))
+        changes.extend(self._read_lines(self.data_dir / "changes.jsonl"))
+
+        with self._db_lock, self._conn:
+            for day in days:
+                for entry in self._load_entries(day):
+                    self._conn.executemany(INSERT_RATE, (
+                        _rate_row(Rate.from_dict(rate_data), entry["timestamp"])
+                        for rate_data in entry.get("rates", [])
+                    ))
+            # Rates upsert idempotently; changes would duplicate, so only fill an empty table
+            if self._conn.execute("SELECT 1 FROM changes LIMIT 1").fetchone() is None:
+                self._conn.executemany(INSERT_CHANGE, (_change_row(c) for c in changes[-MAX_CHANGES:]))
+            # Marked in the import's own transaction, so a failed import is retried on the next start
+            self._conn.execute(f"PRAGMA user_version = {MIGRATED_VERSION}")
+
+        # The history index this database replaces
+        index_path = self.data_dir / "index.sqlite"
+        if index_path.exists():
+            index_path.unlink()
+
+    def _backfill_latest(self):
+        """Fill the latest table from rates if it is empty (new or pre-latest databases)."""
+        with self._db_lock, self._conn:
+            if self._conn.execute("SELECT 1 FROM latest LIMIT 1").fetchone() is None:
+                # SQLite takes the bare columns from the row holding MAX(saved_at)
+                self._conn.execute(
+                    f"INSERT INTO latest SELECT {', '.join(RATE_COLUMNS)}, MAX(saved_at) FROM rates"
+                    " GROUP BY carrier, service, package_name, origin, destination"
+                )
+
+    def _query(self, sql: str, params: tuple = ()) -> List[tuple]:
+        """Run a read query on the shared connection."""
+        with self._db_lock:
+            return self._conn.execute(sql, params).fetchall()
 
     def get_latest_rates(self) -> Dict[str, Rate]:
         """Get the most recent rates for each rate key."""
+        with self._latest_lock:
+            return dict(self._latest())
+
+    def _latest(self) -> Dict[str, Rate]:
+        """
+        The latest-rate cache, reloaded when another process has written and
+        aged to the last LATEST_WINDOW_DAYS. Call with _latest_lock held.
+        """
+        now = time.monotonic()
+        if self._latest_cache is not None and now - self._latest_checked_at < self._latest_ttl:
+            return self._latest_cache
+
+        # Our own saves keep the cache current; data_version only moves on other connections' commits
+        self._latest_checked_at = now
+        data_version = self._query("PRAGMA data_version")[0][0]
+        if self._latest_cache is None or data_version != self._latest_data_version:
+            self._latest_data_version = data_version
+            self._latest_cache = self._load_latest_rates()
+            self._last_seen = {key: round(rate.price * 100) for key, rate in self._latest_cache.items()}
+            # Slow loads earn a longer TTL
+            load_time = time.monotonic() - now
+            self._latest_ttl = min(LATEST_TTL_MAX, max(LATEST_TTL_MIN, 10 * load_time))
+        else:
+            self._expire_latest()
+        return self._latest_cache
+
+    def _latest_cutoff(self) -> str:
+        """Oldest rate timestamp still counted as a latest rate."""
+        return (datetime.now() - timedelta(days=LATEST_WINDOW_DAYS)).isoformat()
+
+    def _expire_latest(self):
+        """Drop cached rates that have aged out of the window. Call with _latest_lock held."""
+        cutoff = self._latest_cutoff()
+        for key in [key for key, rate in self._latest_cache.items() if rate.timestamp < cutoff]:
+            del self._latest_cache[key]
+            self._last_seen.pop(key, None)
+
+    def _latest_prices(self, keys: List[str]) -> np.ndarray:
+        """Get the latest known price for each key, NaN where the rate is new."""
+        with self._latest_lock:
+            get_latest = self._latest().get
+            return np.fromiter(
+                (rate.price if (rate := get_latest(key)) is not None else np.nan for key in keys),
+                dtype=np.float64,
+                count=len(keys),
+            )
+
+    def _load_latest_rates(self) -> Dict[str, Rate]:
+        """Load the most recent rate per key (one row each, not the whole history)."""
+        # Like the old 7-day file scan: rates no carrier has quoted lately are not current
+        rows = self._query(
+            f"SELECT {', '.join(RATE_COLUMNS)} FROM latest WHERE timestamp >= ?",
+            (self._latest_cutoff(),),
+        )
         latest_rates = {}
+        for row in rows:
+            rate = Rate(*row)
+            latest_rates[rate.rate_key()] = rate
+        return latest_rates
 
-        # Check today and yesterday's files
-        for days_ago in range(7):
-            date = datetime.now() - timedelta(days=days_ago)
-            filepath = self._get_file_path(date)
-            if filepath.exists():
-                data = self._load_file(filepath)
-                for entry in reversed(data.get("entries", [])):
-                    for rate_data in entry.get("rates", []):
-                        rate = Rate.from_dict(rate_data)
-                        key = rate.rate_key()
-                        if key not in latest_rates:
-                            latest_rates[key] = rate
-                if latest_rates:
-                    break  # Found data, stop looking
+    def latest_rates_columns(self) -> Dict[str, list]:
+        """Get the most recent rates as parallel columns, one per field."""
+        latest_rates = self.get_latest_rates()
 
-        return latest_rates
+        carriers, services, packages, routes = [], [], [], []
+        currencies, delivery_days, timestamps = [], [], []
+        for rate in latest_rates.values():
+            carriers.append(rate.carrier)
+            services.append(rate.service)
+            packages.append(rate.package_name)
+            routes.append(rate.route)
+            currencies.append(rate.currency)
+            delivery_days.append(rate.delivery_days)
+            timestamps.append(rate.timestamp)
+
+        prices = np.fromiter(
+            (rate.price for rate in latest_rates.values()),
+            dtype=np.float64,
+            count=len(latest_rates),
+        )
+
+        return {
+            "carrier": carriers,
+            "service": services,
+            "package_name": packages,
+            "route": routes,
+            "price": prices,
+            "currency": currencies,
+            "delivery_days": delivery_days,
+            "timestamp": timestamps,
+        }
 
     def save_rates(self, rates: List[Rate]) -> Tuple[List[Rate], List[RateChange]]:
         """
@@ -64,122 +334,117 @@ class StorageManager:
         if not rates:
             return [], []
 
-        # Get latest known rates
-        latest_rates = self.get_latest_rates()
-
-        # Detect changes
-        new_rates = []
-        changes = []
-
-        for rate in rates:
-            key = rate.rate_key()
-
-            if key in latest_rates:
-                old_rate = latest_rates[key]
-                if abs(old_rate.price - rate.price) > 0.01:  # Price changed
-                    change_amount = rate.price - old_rate.price
-                    change_percent = (change_amount / old_rate.price * 100) if old_rate.price > 0 else 0
-                    changes.append(RateChange(
-                        rate=rate,
-                        old_price=old_rate.price,
-                        new_price=rate.price,
-                        change_amount=change_amount,
-                        change_percent=change_percent,
-                        detected_at=datetime.now().isoformat()
-                    ))
-                    new_rates.append(rate)
-            else:
-                # New rate we haven't seen before
-                new_rates.append(rate)
+        # Rates matching the stored price to the cent can't be new or changed, so drop them up front
+        with self._latest_lock:
+            self._latest()
+            last_seen = self._last_seen
+            rates = [rate for rate in rates if last_seen.get(rate.rate_key()) != round(rate.price * 100)]
+        if not rates:
+            return [], []
 
-        # Save to file if we have new data
+        # Detect changes: compare new vs. previous prices as arrays
+        keys = [rate.rate_key() for rate in rates]
+        new_prices = np.fromiter((rate.price for rate in rates), dtype=np.float64, count=len(rates))
+        old_prices = self._latest_prices(keys)
+
+        known = ~np.isnan(old_prices)
+        changed = known & (np.abs(new_prices - old_prices) > 0.01)  # Price changed
+        amounts = new_prices - old_prices
+        with np.errstate(divide="ignore", invalid="ignore"):
+            percents = np.where(old_prices > 0, amounts / old_prices * 100, 0.0)
+
+        # New rates we haven't seen before, plus rates whose price changed
+        new_idx = np.flatnonzero(changed | ~known).tolist()
+        new_rates = [rates[i] for i in new_idx]
+
+        # One timestamp for the whole batch: changes and stored rows share it
+        now = datetime.now().isoformat()
+        changed_idx = np.flatnonzero(changed)
+        changes = [
+            RateChange(
+                rate=rates[i],
+                old_price=old,
+                new_price=new,
+                change_amount=amount,
+                change_percent=percent,
+                detected_at=now
+            )
+            for i, old, new, amount, percent in zip(
+                changed_idx.tolist(),
+                old_prices[changed_idx].tolist(),
+                new_prices[changed_idx].tolist(),
+                amounts[changed_idx].tolist(),
+                percents[changed_idx].tolist(),
+            )
+        ]
+
+        # Store new data and its changes in one transaction
         if new_rates:
-            filepath = self._get_file_path()
-            data = self._load_file(filepath)
-
-            entry = {
-                "timestamp": datetime.now().isoformat(),
-                "rates": [r.to_dict() for r in new_rates]
-            }
-            data["entries"].append(entry)
-
-            self._save_file(filepath, data)
-
-            # Also save changes to a separate file
-            if changes:
-                self._save_changes(changes)
+            with self._db_lock, self._conn:
+                rows = [_rate_row(rate, now) for rate in new_rates]
+                self._conn.executemany(INSERT_RATE, rows)
+                self._conn.executemany(INSERT_LATEST, rows)
+                self._conn.executemany(INSERT_CHANGE, (_change_row(change) for change in changes))
+
+            with self._latest_lock:
+                latest = self._latest()
+                for i in new_idx:
+                    latest[keys[i]] = rates[i]
+                    self._last_seen[keys[i]] = round(rates[i].price * 100)
 
         return new_rates, changes
 
-    def _save_changes(self, changes: List[RateChange]):
-        """Save rate changes to a separate file."""
-        changes_file = self.data_dir / "changes.json"
-
-        if changes_file.exists():
-            with open(changes_file, "r") as f:
-                data = json.load(f)
-        else:
-            data = {"changes": []}
-
-        for change in changes:
-            data["changes"].append(change.to_dict())
-
-        # Keep only last 1000 changes
-        data["changes"] = data["changes"][-1000:]
-
-        with open(changes_file, "w") as f:
-            json.dump(data, f, indent=2)
+    def get_change_counts(self) -> Tuple[int, int, int]:
+        """Get (increases, decreases, total) over the stored rate changes."""
+        increases, decreases, total = self._query(
+            "SELECT TOTAL(change_amount > 0), TOTAL(change_amount < 0), COUNT(*) FROM changes"
+        )[0]
+        return int(increases), int(decreases), total
 
     def get_all_changes(self, limit: int = 100) -> List[RateChange]:
-        """Get recent rate changes."""
-        changes_file = self.data_dir / "changes.json"
-
-        if not changes_file.exists():
-            return []
-
-        with open(changes_file, "r") as f:
-            data = json.load(f)
-
-        changes = []
-        for change_data in data.get("changes", [])[-limit:]:
-            rate = Rate.from_dict(change_data["rate"])
-            changes.append(RateChange(
-                rate=rate,
-                old_price=change_data["old_price"],
-                new_price=change_data["new_price"],
-                change_amount=change_data["change_amount"],
-                change_percent=change_data["change_percent"],
-                detected_at=change_data["detected_at"]
-            ))
-
-        return list(reversed(changes))  # Most recent first
+        """Get recent rate changes, most recent first."""
+        rows = self._query(
+            "SELECT rate, old_price, new_price, change_amount, change_percent, detected_at"
+            " FROM changes ORDER BY id DESC LIMIT ?",
+            (limit,),
+        )
+        return [
+            RateChange(
+                rate=Rate.from_dict(orjson.loads(rate)),
+                old_price=old_price,
+                new_price=new_price,
+                change_amount=change_amount,
+                change_percent=change_percent,
+                detected_at=detected_at
+            )
+            for rate, old_price, new_price, change_amount, change_percent, detected_at in rows
+        ]
+
+    def _window_start(self, days: int) -> str:
+        """Start of a `days`-day window: midnight today minus days - 1."""
+        start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=days - 1)
+        return start.isoformat()
 
     def get_historical_rates(self, days: int = 30) -> List[Dict]:
-        """Get all rate entries from the last N days."""
-        all_entries = []
-
-        for days_ago in range(days):
-            date = datetime.now() - timedelta(days=days_ago)
-            filepath = self._get_file_path(date)
-            if filepath.exists():
-                data = self._load_file(filepath)
-                all_entries.extend(data.get("entries", []))
-
-        return sorted(all_entries, key=lambda x: x["timestamp"])
+        """Get all rate entries from the last N days, as {"timestamp", "rates"} dicts."""
+        rows = self._query(
+            f"SELECT saved_at, {', '.join(RATE_COLUMNS)} FROM rates WHERE saved_at >= ? ORDER BY saved_at",
+            (self._window_start(days),),
+        )
+        return [
+            {"timestamp": saved_at, "rates": [dict(zip(RATE_COLUMNS, row[1:])) for row in batch]}
+            for saved_at, batch in groupby(rows, key=lambda row: row[0])
+        ]
 
     def get_rate_history(self, carrier: str, service: str, package: str, days: int = 30) -> List[Tuple[datetime, float]]:
         """Get price history for a specific rate."""
-        history = []
-
-        for entry in self.get_historical_rates(days):
-            for rate_data in entry.get("rates", []):
-                if (rate_data["carrier"] == carrier and
-                    rate_data["service"] == service and
-                    rate_data["package_name"] == package):
-                    timestamp = datetime.fromisoformat(entry["timestamp"])
-                    history.append((timestamp, rate_data["price"]))
-
-        return sorted(history, key=lambda x: x[0])
+        rows = self._query(
+            "SELECT saved_at, price FROM rates"
+            " WHERE carrier = ? AND service = ? AND package_name = ? AND saved_at >= ?"
+            " ORDER BY saved_at",
+            (carrier, service, package, self._window_start(days)),
+        )
+        return [(datetime.fromisoformat(saved_at), price) for saved_at, price in rows]
 
     def get_scrape_status(self) -> Dict:
         """Get the last scrape timestamp and stats."""